@@ -1,6 +1,6 @@
 import streamlit as st
 import pandas as pd
-import openpyxl
+import numpy as np
 from io import BytesIO
 
 # -------------------------------
@@ -8,6 +8,77 @@ from io import BytesIO
 # -------------------------------
 st.set_page_config(layout="centered")
 
+# -------------------------------
+# Cached CSV loading
+# -------------------------------
+TIMESHEET_COLUMNS = {"description", "activity", "date", "hours", "minutes", "spent hours"}
+# Sentinel descriptions, pre-lowered so the filter is case-insensitive
+DROP_DESCRIPTIONS = np.array(["", "total", "weekly total"], dtype=object)
+
+@st.cache_data(show_spinner=False)
+def load_timesheet(csv_bytes):
+    df = pd.read_csv(
+        BytesIO(csv_bytes),
+        encoding="utf-8-sig",
+        keep_default_na=False,
+        usecols=lambda c: c.strip().lower() in TIMESHEET_COLUMNS,
+    )
+    # Normalize columns
+    df.columns = [c.strip().lower() for c in df.columns]
+    return df
+
+# -------------------------------
+# Cached template bytes
+# -------------------------------
+TEMPLATE_PATH = "Enosis-Schedulewise Weekly Status Template.xlsx"
+
+@st.cache_resource
+def template_bytes():
+    with open(TEMPLATE_PATH, "rb") as f:
+        return f.read()
+
+# -------------------------------
+# Format decimal hours as "0h 0m"
+# -------------------------------
+def format_hours(decimal_hours):
+    total_minutes = round(decimal_hours * 60)
+    h = total_minutes // 60
+    m = total_minutes % 60
+    return f"{h}h {m}m"
+
+# -------------------------------
+# Cached task merging + formatting
+# -------------------------------
+@st.cache_data(show_spinner=False)
+def merge_tasks(df):
+    # Bucket every Communication row under one title, keep other rows per
+    # description, and aggregate everything in a single groupby pass
+    task_key = np.where(
+        df["activity"].str.lower().to_numpy() == "communication",
+        "Communication",
+        df["description"].to_numpy(),
+    )
+    processed_tasks = (
+        df.groupby(pd.Categorical(task_key), observed=True, sort=False)["spent_hours"]
+        .sum()
+        .rename_axis("Task Title")
+        .reset_index(name="Spent Hours Decimal")
+    )
+    processed_tasks["Task Title"] = processed_tasks["Task Title"].astype(str)
+
+    # Keep Communication as the first row
+    is_comm = processed_tasks["Task Title"].to_numpy() == "Communication"
+    if is_comm.any():
+        processed_tasks = pd.concat(
+            [processed_tasks[is_comm], processed_tasks[~is_comm]], ignore_index=True
+        )
+
+    # Format Spent Hours as "0h 0m"
+    total_minutes = np.round(processed_tasks["Spent Hours Decimal"].to_numpy() * 60).astype(int)
+    task_h, task_m = np.divmod(total_minutes, 60)
+    processed_tasks["Spent Hours"] = [f"{h}h {m}m" for h, m in zip(task_h, task_m)]
+    return processed_tasks
+
 # -------------------------------
 # Header with logo inline
 # -------------------------------
@@ -19,15 +90,52 @@ logo_svg = """
 </svg>
 """
 
-st.markdown(
-    f"""
-    <div style="display:flex; align-items:center; gap:10px;">
-        <div>{logo_svg}</div>
-        <h1 style="margin:0; color:white; font-size:32px;">Weekly Status Generate</h1>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+# Pre-rendered header/footer markup (static, built once at import)
+HEADER_HTML = f"""
+<div style="display:flex; align-items:center; gap:10px;">
+    <div>{logo_svg}</div>
+    <h1 style="margin:0; color:white; font-size:32px;">Weekly Status Generate</h1>
+</div>
+"""
+
+FOOTER_HTML = """
+<div style="
+    position: fixed;
+    bottom: 32px;
+    width: 100%;
+    text-align: left;
+    color: white;
+    font-size: 14px;
+    opacity: 0.7;
+    font-weight: 400
+">
+    Created by Sakib Hasan
+</div>
+"""
+
+# Custom CSS for checkbox style (static, built once at import)
+CHECKBOX_CSS = """
+<style>
+/* Set checkbox column width */
+div[data-testid="stDataFrame"] table td:first-child,
+div[data-testid="stDataFrame"] table th:first-child {
+    width:48px !important;
+    min-width:48px !important;
+    max-width:48px !important;
+    text-align:center !important;
+}
+/* Hide header for checkbox column */
+div[data-testid="stDataFrame"] table th:first-child div {
+    display:none !important;
+}
+/* Change checkbox color */
+input[type=checkbox] {
+    accent-color: #1976d2; /* blue */
+}
+</style>
+"""
+
+st.markdown(HEADER_HTML, unsafe_allow_html=True)
 
 # -------------------------------
 # Step 1: Upload CSV
@@ -36,14 +144,11 @@ uploaded_csv = st.file_uploader("Upload your timesheet CSV", type=["csv"])
 
 if uploaded_csv:
     try:
-        df = pd.read_csv(uploaded_csv, encoding="utf-8-sig", keep_default_na=False)
+        df = load_timesheet(uploaded_csv.getvalue())
     except Exception as e:
         st.error(f"Error reading CSV: {e}")
         st.stop()
 
-    # Normalize columns
-    df.columns = df.columns.str.strip().str.lower()
-
     # Check required columns
     required_cols = ["description", "activity", "date"]
     missing_cols = [col for col in required_cols if col not in df.columns]
@@ -51,71 +156,59 @@ if uploaded_csv:
         st.error(f"CSV is missing required columns: {missing_cols}")
         st.stop()
 
-    # Remove irrelevant rows
-    df = df[~df["description"].isin(["", "Total", "Weekly Total"])]
-    df = df.dropna(subset=["description", "activity", "date"])
+    # Remove irrelevant rows in one pass
+    keep = (
+        df["description"].notna().to_numpy()
+        & df["activity"].notna().to_numpy()
+        & df["date"].notna().to_numpy()
+        & ~np.isin(df["description"].astype(str).str.strip().str.lower().to_numpy(), DROP_DESCRIPTIONS)
+    )
+    df = df.loc[keep]
 
     # Convert hours+minutes to decimal
     if "hours" in df.columns and "minutes" in df.columns:
-        df["spent_hours"] = df["hours"].astype(float) + df["minutes"].astype(float)/60
+        df["spent_hours"] = df["hours"].to_numpy(dtype=float) + df["minutes"].to_numpy(dtype=float) * (1 / 60)
     elif "spent hours" in df.columns:
-        df["spent_hours"] = df["spent hours"].astype(float)
+        df["spent_hours"] = df["spent hours"].to_numpy(dtype=float)
     else:
         st.error("CSV must have either 'Hours' and 'Minutes' or 'Spent Hours'.")
         st.stop()
 
     # -------------------------------
-    # Step 2: Merge tasks
+    # Step 2: Merge tasks and format hours (cached across reruns)
     # -------------------------------
-    communication_tasks = df[df["activity"].str.lower() == "communication"]
-    other_tasks = df[df["activity"].str.lower() != "communication"]
-
-    rows = []
-
-    # Merge Communication
-    if not communication_tasks.empty:
-        comm_hours = communication_tasks["spent_hours"].sum()
-        rows.append({"Task Title": "Communication", "Spent Hours Decimal": comm_hours})
-
-    # Merge duplicate other tasks
-    if not other_tasks.empty:
-        grouped = other_tasks.groupby("description", as_index=False).agg({"spent_hours": "sum"})
-        for _, row in grouped.iterrows():
-            rows.append({"Task Title": row["description"], "Spent Hours Decimal": row["spent_hours"]})
-
-    processed_tasks = pd.DataFrame(rows)
+    processed_tasks = merge_tasks(df)
 
     # -------------------------------
-    # Step 3: Format Spent Hours as "0h 0m"
-    # -------------------------------
-    def format_hours(decimal_hours):
-        total_minutes = round(decimal_hours * 60)
-        h = total_minutes // 60
-        m = total_minutes % 60
-        return f"{h}h {m}m"
-
-    processed_tasks["Spent Hours"] = processed_tasks["Spent Hours Decimal"].apply(format_hours)
-
-    # -------------------------------
-    # Step 4: Add Weekly Total Row for display
+    # Step 3: Add Weekly Total Row for display
     # -------------------------------
     total_decimal_hours = processed_tasks["Spent Hours Decimal"].sum()
     total_formatted_hours = format_hours(total_decimal_hours)
-    
-    weekly_total = pd.DataFrame([{"Task Title": "Weekly Total", "Spent Hours": total_formatted_hours}])
-    final_table_display = pd.concat([processed_tasks[["Task Title", "Spent Hours"]], weekly_total], ignore_index=True)
+
+    final_table_display = pd.DataFrame({
+        "Task Title": [*processed_tasks["Task Title"], "Weekly Total"],
+        "Spent Hours": [*processed_tasks["Spent Hours"], total_formatted_hours],
+    })
 
     # -------------------------------
-    # Step 5: Display Table with Checkboxes
+    # Step 4: Display Table with Checkboxes
     # -------------------------------
     st.subheader("Weekly Status Preview")
 
-    # Period Covered below the heading
-    df['date'] = pd.to_datetime(df['date'], errors='coerce')
-    df = df.dropna(subset=['date'])
-    start_date = df['date'].min()
-    end_date = df['date'].max()
-    period_covered = f"{start_date.strftime('%B %d')} - {end_date.strftime('%B %d, %Y')}"
+    # Period Covered below the heading — only min/max matter, so parse the
+    # handful of unique dates instead of the full column
+    unique_dates = df['date'].drop_duplicates()
+    try:
+        # Fast vectorised path for ISO dates; fall back to inference otherwise
+        unique_dates = pd.to_datetime(unique_dates, format='ISO8601')
+    except (ValueError, TypeError):
+        unique_dates = pd.to_datetime(unique_dates, errors='coerce')
+    unique_dates = unique_dates.dropna()
+    if unique_dates.empty:
+        period_covered = "N/A"
+    else:
+        start_date, end_date = unique_dates.agg(['min', 'max'])
+        period_covered = f"{start_date.strftime('%B %d')} - {end_date.strftime('%B %d, %Y')}"
     st.markdown(
         f"<p style='color:white; font-size:16px; font-weight:bold;'>Period Covered: {period_covered}</p>",
         unsafe_allow_html=True
@@ -133,51 +226,36 @@ if uploaded_csv:
     )
 
     # Custom CSS for checkbox style
-    st.markdown(
-        """
-        <style>
-        /* Set checkbox column width */
-        div[data-testid="stDataFrame"] table td:first-child, 
-        div[data-testid="stDataFrame"] table th:first-child {
-            width:48px !important;
-            min-width:48px !important;
-            max-width:48px !important;
-            text-align:center !important;
-        }
-        /* Hide header for checkbox column */
-        div[data-testid="stDataFrame"] table th:first-child div {
-            display:none !important;
-        }
-        /* Change checkbox color */
-        input[type=checkbox] {
-            accent-color: #1976d2; /* blue */
-        }
-        </style>
-        """,
-        unsafe_allow_html=True
-    )
+    st.markdown(CHECKBOX_CSS, unsafe_allow_html=True)
 
     # -------------------------------
-    # Step 6: Download Filled XLSX Template
+    # Step 5: Download Filled XLSX Template
     # -------------------------------
     try:
-        template_path = "Enosis-Schedulewise Weekly Status Template.xlsx"
-        workbook = openpyxl.load_workbook(template_path)
-        sheet = workbook["Weekly Task Status V2.0"]
+        template = template_bytes()  # surface a missing/unreadable template before the button renders
+
+        def build_filled_workbook():
+            import openpyxl  # deferred: only needed once a download happens
+
+            workbook = openpyxl.load_workbook(BytesIO(template))
+            sheet = workbook["Weekly Task Status V2.0"]
 
-        start_row = 11  # tasks start here
-        for index, task in processed_tasks.iterrows():
-            current_row = start_row + index
-            sheet[f'C{current_row}'] = task['Task Title']
-            sheet[f'G{current_row}'] = task['Spent Hours']
+            start_row = 11  # tasks start here
+            task_rows = processed_tasks[["Task Title", "Spent Hours"]].itertuples(index=False, name=None)
+            for index, (title, spent) in enumerate(task_rows):
+                current_row = start_row + index
+                sheet[f'C{current_row}'] = title
+                sheet[f'G{current_row}'] = spent
 
-        excel_buffer = BytesIO()
-        workbook.save(excel_buffer)
-        excel_buffer.seek(0)
+            excel_buffer = BytesIO()
+            workbook.save(excel_buffer)
+            return excel_buffer.getvalue()
 
+        # Passing the builder as a callable defers the workbook fill/save
+        # until the button is actually clicked
         st.download_button(
             "📥 Download Filled Status (.xlsx)",
-            excel_buffer,
+            build_filled_workbook,
             "weekly_status_filled.xlsx",
             "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
@@ -187,20 +265,4 @@ if uploaded_csv:
 # -------------------------------
 # Footer
 # -------------------------------
-st.markdown(
-    """
-    <div style="
-        position: fixed;
-        bottom: 32px;
-        width: 100%;
-        text-align: left;
-        color: white;
-        font-size: 14px;
-        opacity: 0.7;
-        font-weight: 400
-    ">
-        Created by Sakib Hasan
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+st.markdown(FOOTER_HTML, unsafe_allow_html=True)